@@ -1,17 +1,25 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import os
+from urllib.parse import quote
 
 from routers.identify import router as identify_router
 from routers.telemetry import router as telemetry_router
+from services import device_store
+from utils.http_utils import SESSION
 
 # =========================
 # CONFIG
 # =========================
 PLANT_IMAGES_DIR = "plant_images"
 
-app = FastAPI()
+# Behind nginx, set this to an `internal` location (e.g. "/_plant_images/") so
+# /images/* is answered with X-Accel-Redirect and nginx sends the file itself.
+IMAGES_ACCEL_REDIRECT = os.getenv("ARDURAIN_IMAGES_ACCEL_REDIRECT", "")
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,14 +29,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def close_clients():
+    SESSION.close()
+    await device_store.close()
+
 # ✅ Health check (useful for uptime pings + debugging)
 @app.get("/health")
 async def health():
     return {"ok": True}
 
 os.makedirs(PLANT_IMAGES_DIR, exist_ok=True)
-app.mount("/images", StaticFiles(directory=PLANT_IMAGES_DIR), name="images")
+if IMAGES_ACCEL_REDIRECT:
+    @app.get("/images/{filename}")
+    async def images(filename: str):
+        if filename != os.path.basename(filename) or filename.startswith("."):
+            raise HTTPException(status_code=404)
+        target = IMAGES_ACCEL_REDIRECT.rstrip("/") + "/" + quote(filename)
+        return Response(headers={"X-Accel-Redirect": target})
+else:
+    app.mount("/images", StaticFiles(directory=PLANT_IMAGES_DIR), name="images")
 
 # Routers
 app.include_router(identify_router)
 app.include_router(telemetry_router)
+
+
+if __name__ == "__main__":
+    import sys
+    import uvicorn
+
+    # Keep 1 worker unless ARDURAIN_REDIS_URL is set (telemetry is per-process otherwise)
+    uvicorn.run(
+        "fastapi_server:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        # uvloop has no Windows build; uvicorn[standard] installs it everywhere else
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("ARDURAIN_WORKERS", "1")),
+        backlog=4096,
+        limit_concurrency=2048,
+        timeout_keep_alive=30,
+    )
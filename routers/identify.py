@@ -1,24 +1,72 @@
-from fastapi import APIRouter, UploadFile, File, Request
-from datetime import datetime, timezone
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Request
+import asyncio
+import hashlib
 import os
-import json
-from typing import Optional
+import orjson
+from typing import Any, Dict, Optional, Tuple
 
 from services.plantnet_service import identify_plant
 from services.wiki_service import get_wiki_info
-from services.wikidata_service import infer_primary_and_traits
-from services.moisture_service import compute_moisture, compute_climate
+from services.wikidata_service import get_wikidata_traits, infer_primary_and_traits
+from services.moisture_service import compute_plant_targets
 from utils.text_utils import dedup_preserve_order
+from utils.time_utils import file_timestamp
 
 PLANT_IMAGES_DIR = "plant_images"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# ISO-BMFF brands used by HEIC/HEIF files (bytes 8..12, right after "ftyp")
+_HEIC_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"heif"}
+# Generic HEIF-structure brands: AVIF files carry them as the major brand too,
+# so they only mean HEIC alongside an HEVC compatible brand
+_HEIF_GENERIC_BRANDS = {b"mif1", b"msf1"}
+_HEVC_BRANDS = {b"heic", b"heix", b"hevc", b"hevx"}
+# Enough for the whole "ftyp" box of a HEIC/AVIF file
+_SNIFF_SIZE = 64
 
 router = APIRouter()
 
+# image sha256 -> running PlantNet + Wikipedia/Wikidata lookup (single-flight)
+_INFLIGHT: Dict[str, "asyncio.Task[Tuple[Optional[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]]"] = {}
+
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
+def _save_upload(src: Any, path: str) -> str:
+    """
+    Streams the (spooled) upload to disk in fixed-size chunks.
+    Returns the sha256 hex digest of the bytes written.
+    """
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        while True:
+            chunk = src.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def _hash_upload(src: Any) -> str:
+    # sha256 of the (spooled) upload without writing it anywhere; rewinds afterwards
+    digest = hashlib.sha256()
+    while True:
+        chunk = src.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    src.seek(0)
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    with open(path, "wb") as jf:
+        jf.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
 def _guess_ext(upload: UploadFile) -> str:
     """
     Decide the best extension for saving the uploaded image.
@@ -47,14 +95,29 @@ def _guess_ext(upload: UploadFile) -> str:
     return ".jpg"
 
 
-def _is_heic(upload: UploadFile, ext: str) -> bool:
+def _sniff_heic(head: bytes) -> bool:
+    # HEIC/HEIF files start with a "ftyp" box: size(4) + "ftyp" + major
+    # brand(4) + minor version(4) + compatible brands(4 each)
+    if len(head) < 12 or head[4:8] != b"ftyp":
+        return False
+    major = head[8:12]
+    if major in _HEIC_BRANDS:
+        return True
+    if major not in _HEIF_GENERIC_BRANDS:
+        return False
+    end = min(int.from_bytes(head[:4], "big"), len(head))
+    return any(head[i:i + 4] in _HEVC_BRANDS for i in range(16, end - 3, 4))
+
+
+def _is_heic(upload: UploadFile, ext: str, head: bytes = b"") -> bool:
     ct = (upload.content_type or "").lower()
-    return ext in {".heic", ".heif"} or ct in {"image/heic", "image/heif"}
+    return ext in {".heic", ".heif"} or ct in {"image/heic", "image/heif"} or _sniff_heic(head)
 
 
-def _try_convert_heic_to_jpg(src_path: str, dst_path: str) -> bool:
+def _try_convert_heic_to_jpg(src: Any, dst_path: str) -> bool:
     """
     Tries to convert HEIC/HEIF -> JPEG.
+    src can be a path or a binary file object (e.g. the spooled upload).
     Returns True if converted, False otherwise.
     Requires pillow + pillow-heif on the server.
     """
@@ -67,7 +130,7 @@ def _try_convert_heic_to_jpg(src_path: str, dst_path: str) -> bool:
             # If pillow-heif isn't available, PIL probably can't open HEIC
             pass
 
-        with Image.open(src_path) as im:
+        with Image.open(src) as im:
             im = im.convert("RGB")
             im.save(dst_path, format="JPEG", quality=92, optimize=True)
         return True
@@ -75,38 +138,79 @@ def _try_convert_heic_to_jpg(src_path: str, dst_path: str) -> bool:
         return False
 
 
+async def _lookup_plant(
+    image_path: str, image_hash: str
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+    # Identify plant via PlantNet
+    info = await asyncio.to_thread(identify_plant, image_path, image_hash)
+    if not info:
+        return None, {}, {}
+
+    scientific = info.get("scientific_name", "Unknown")
+
+    # Wikipedia info (rich text + images + url) and Wikidata labels are
+    # independent lookups, so fetch them concurrently. The Wikidata labels are
+    # handed to infer_primary_and_traits so inference itself does no I/O.
+    wiki, wd = await asyncio.gather(
+        _enrich(get_wiki_info, scientific),
+        _enrich(get_wikidata_traits, scientific),
+    )
+    return info, wiki, wd
+
+
+async def _enrich(lookup: Any, scientific: str) -> Dict[str, Any]:
+    # Wikipedia/Wikidata only enrich an identification PlantNet already made:
+    # on failure fall back to {} (defaults / no labels) instead of failing it
+    try:
+        return await asyncio.to_thread(lookup, scientific)
+    except Exception:
+        return {}
+
+
+async def _lookup_plant_once(
+    image_path: str, image_hash: str
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+    """
+    Concurrent uploads of the same image share one lookup instead of each
+    hitting PlantNet/Wikipedia/Wikidata. No lock needed: the dict is only
+    touched from the event loop and there is no await between get and set.
+    """
+    task = _INFLIGHT.get(image_hash)
+    if task is None:
+        task = asyncio.create_task(_lookup_plant(image_path, image_hash))
+        _INFLIGHT[image_hash] = task
+        task.add_done_callback(lambda _t: _INFLIGHT.pop(image_hash, None))
+    # Shielded so one client disconnecting doesn't cancel the lookup for the others
+    return await asyncio.shield(task)
+
+
 @router.post("/identify_plant")
-async def identify_plant_endpoint(request: Request, file: UploadFile = File(...)):
+async def identify_plant_endpoint(
+    request: Request, background_tasks: BackgroundTasks, file: UploadFile = File(...)
+):
     _ensure_dir(PLANT_IMAGES_DIR)
 
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M-%S")
+    timestamp = file_timestamp()
 
-    # Read bytes
-    contents = await file.read()
-    if not contents:
+    # Peek at the header only; the body is streamed to disk below
+    head = await file.read(_SNIFF_SIZE)
+    if not head:
         return {"success": False, "error": "Empty upload."}
+    await file.seek(0)
 
-    # Pick extension based on upload
+    # Pick extension based on upload (the file header also flags HEIC)
     ext = _guess_ext(file)
 
-    # Save initial file
-    filename = f"plant_{timestamp}{ext}"
-    image_path = os.path.join(PLANT_IMAGES_DIR, filename)
-
-    with open(image_path, "wb") as f:
-        f.write(contents)
+    # Disk/PIL work runs on a worker thread so the event loop stays free
+    if _is_heic(file, ext, head):
+        # HEIC/HEIF: decode straight from the upload and only keep the JPG,
+        # which PlantNet accepts and the UI can show
+        filename = f"plant_{timestamp}.jpg"
+        image_path = os.path.join(PLANT_IMAGES_DIR, filename)
 
-    # If HEIC/HEIF, try convert to JPG for PlantNet compatibility
-    if _is_heic(file, ext):
-        jpg_filename = f"plant_{timestamp}.jpg"
-        jpg_path = os.path.join(PLANT_IMAGES_DIR, jpg_filename)
-
-        converted = _try_convert_heic_to_jpg(image_path, jpg_path)
-        if converted:
-            # Prefer the converted jpg for identification and for serving in UI
-            filename = jpg_filename
-            image_path = jpg_path
-        else:
+        image_hash = await asyncio.to_thread(_hash_upload, file.file)
+        converted = await asyncio.to_thread(_try_convert_heic_to_jpg, file.file, image_path)
+        if not converted:
             # Don't silently fail: PlantNet often rejects HEIC.
             return {
                 "success": False,
@@ -117,10 +221,14 @@ async def identify_plant_endpoint(request: Request, file: UploadFile = File(...)
                     "to export JPEG/PNG."
                 ),
             }
+    else:
+        filename = f"plant_{timestamp}{ext}"
+        image_path = os.path.join(PLANT_IMAGES_DIR, filename)
+        image_hash = await asyncio.to_thread(_save_upload, file.file, image_path)
 
-    # Identify plant via PlantNet
+    # PlantNet + Wikipedia + Wikidata
     try:
-        info = identify_plant(image_path)
+        info, wiki, wd = await _lookup_plant_once(image_path, image_hash)
     except Exception as e:
         return {"success": False, "error": f"PlantNet error: {str(e)}"}
 
@@ -130,28 +238,18 @@ async def identify_plant_endpoint(request: Request, file: UploadFile = File(...)
     scientific = info.get("scientific_name", "Unknown")
     common_names = info.get("common_names", []) or []
 
-    # Wikipedia info (rich text + images + url)
-    wiki = get_wiki_info(scientific)
-
-    # Primary category + traits
-    primary, traits, reasoning = infer_primary_and_traits(
+    # Primary category + traits (reads/writes the on-disk inference cache)
+    primary, traits, reasoning = await asyncio.to_thread(
+        infer_primary_and_traits,
         scientific_name=scientific,
         wiki_hint=wiki.get("summary_for_tags", ""),
+        debug=True,  # surfaced to the app as category_reasoning
+        wd_labels=tuple(wd.get("labels", [])),
+        wd_hits=tuple(wd["matched_kw"]) if "matched_kw" in wd else None,
     )
 
-    # Moisture (existing)
-    moisture_min, moisture_max, moisture_target, moisture_mods = compute_moisture(primary, traits)
-
-    # Climate (temp/humidity)
-    (
-        temp_min,
-        temp_max,
-        temp_target,
-        hum_min,
-        hum_max,
-        hum_target,
-        climate_mods,
-    ) = compute_climate(primary, traits)
+    # Moisture + climate targets (memoized per primary + trait set)
+    targets = compute_plant_targets(primary, traits)
 
     # Build image URL for uploaded image
     base_url = str(request.base_url).rstrip("/")
@@ -177,17 +275,17 @@ async def identify_plant_endpoint(request: Request, file: UploadFile = File(...)
         "category": primary,
 
         # Moisture targets
-        "moisture_min": moisture_min,
-        "moisture_max": moisture_max,
-        "moisture_target": moisture_target,
+        "moisture_min": targets.moisture_min,
+        "moisture_max": targets.moisture_max,
+        "moisture_target": targets.moisture_target,
 
         # Climate targets
-        "temp_min": temp_min,
-        "temp_max": temp_max,
-        "temp_target": temp_target,
-        "humidity_min": hum_min,
-        "humidity_max": hum_max,
-        "humidity_target": hum_target,
+        "temp_min": targets.temp_min,
+        "temp_max": targets.temp_max,
+        "temp_target": targets.temp_target,
+        "humidity_min": targets.humidity_min,
+        "humidity_max": targets.humidity_max,
+        "humidity_target": targets.humidity_target,
 
         # Meta
         "timestamp": timestamp,
@@ -202,13 +300,12 @@ async def identify_plant_endpoint(request: Request, file: UploadFile = File(...)
 
         # Debug helpers (keep during development)
         "category_reasoning": reasoning,
-        "trait_modifiers_applied": moisture_mods,
-        "climate_modifiers_applied": climate_mods,
+        "trait_modifiers_applied": targets.moisture_mods,
+        "climate_modifiers_applied": targets.climate_mods,
     }
 
-    # Save JSON alongside image
+    # Save JSON alongside image, after the response has been sent
     json_path = os.path.join(PLANT_IMAGES_DIR, f"plant_{timestamp}.json")
-    with open(json_path, "w", encoding="utf-8") as jf:
-        json.dump(data, jf, indent=4, ensure_ascii=False)
+    background_tasks.add_task(_write_json, json_path, data)
 
     return data
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
-from threading import Lock
-from datetime import datetime, timezone
+from fastapi import APIRouter
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Dict, Any, List, Optional
+
+from services import device_store
+from utils.time_utils import now_iso
 
 router = APIRouter()
 
@@ -10,6 +11,9 @@ router = APIRouter()
 # Models
 # -------------------------
 class TelemetryUpdate(BaseModel):
+    # Frozen + flat, so __dict__.copy() is a cheap stand-in for model_dump()
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     device_id: str = Field(..., min_length=1)
     soil: int = Field(..., ge=0, le=100)
     temp: float
@@ -17,7 +21,13 @@ class TelemetryUpdate(BaseModel):
     pump_on: bool
 
 
+class TelemetryBatch(BaseModel):
+    items: List[TelemetryUpdate] = Field(..., min_length=1, max_length=256)
+
+
 class DeviceConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     device_id: str = Field(..., min_length=1)
 
     # Moisture (0–100)
@@ -35,13 +45,18 @@ class DeviceConfig(BaseModel):
     humidity_max: int = Field(70, ge=0, le=100)
     humidity_target: int = Field(55, ge=0, le=100)
 
-
-# -------------------------
-# In-memory storage
-# -------------------------
-_TELEMETRY_LATEST: Dict[str, Dict[str, Any]] = {}
-_DEVICE_CONFIG: Dict[str, Dict[str, Any]] = {}
-_LOCK = Lock()
+    @model_validator(mode="after")
+    def _check_ranges(self) -> "DeviceConfig":
+        # Ordering checks; FastAPI turns the ValueError into a 422 response
+        for name in ("moisture", "temp", "humidity"):
+            lo = getattr(self, f"{name}_min")
+            hi = getattr(self, f"{name}_max")
+            target = getattr(self, f"{name}_target")
+            if hi < lo:
+                raise ValueError(f"{name}_max must be >= {name}_min")
+            if target < lo or target > hi:
+                raise ValueError(f"{name}_target must be within [{name}_min, {name}_max]")
+        return self
 
 
 # -------------------------
@@ -49,18 +64,28 @@ _LOCK = Lock()
 # -------------------------
 @router.post("/telemetry/update")
 async def telemetry_update(payload: TelemetryUpdate):
-    now = datetime.now(timezone.utc).isoformat()
-    data = payload.model_dump()
-    data["ts"] = now
-    with _LOCK:
-        _TELEMETRY_LATEST[payload.device_id] = data
+    data = payload.__dict__.copy()
+    data["ts"] = now_iso()
+    await device_store.set_telemetry(payload.device_id, data)
     return {"success": True, "stored": data}
 
 
+@router.post("/telemetry/update_batch")
+async def telemetry_update_batch(payload: TelemetryBatch):
+    # One timestamp for the whole batch; later readings for a device win
+    now = now_iso()
+    batch: Dict[str, Dict[str, Any]] = {}
+    for item in payload.items:
+        data = item.__dict__.copy()
+        data["ts"] = now
+        batch[item.device_id] = data
+    await device_store.set_telemetry_many(batch)
+    return {"success": True, "received": len(payload.items), "devices": len(batch)}
+
+
 @router.get("/telemetry/latest")
 async def telemetry_latest(device_id: str):
-    with _LOCK:
-        data = _TELEMETRY_LATEST.get(device_id)
+    data = await device_store.get_telemetry(device_id)
     if not data:
         return {"success": False, "error": "No telemetry yet for this device_id."}
     return {"success": True, "telemetry": data}
@@ -71,28 +96,11 @@ async def telemetry_latest(device_id: str):
 # -------------------------
 @router.post("/device/config/set")
 async def device_config_set(payload: DeviceConfig):
-    # Validate ordering
-    if payload.moisture_max < payload.moisture_min:
-        raise HTTPException(status_code=400, detail="moisture_max must be >= moisture_min")
-    if payload.moisture_target < payload.moisture_min or payload.moisture_target > payload.moisture_max:
-        raise HTTPException(status_code=400, detail="moisture_target must be within [moisture_min, moisture_max]")
-
-    if payload.temp_max < payload.temp_min:
-        raise HTTPException(status_code=400, detail="temp_max must be >= temp_min")
-    if payload.temp_target < payload.temp_min or payload.temp_target > payload.temp_max:
-        raise HTTPException(status_code=400, detail="temp_target must be within [temp_min, temp_max]")
-
-    if payload.humidity_max < payload.humidity_min:
-        raise HTTPException(status_code=400, detail="humidity_max must be >= humidity_min")
-    if payload.humidity_target < payload.humidity_min or payload.humidity_target > payload.humidity_max:
-        raise HTTPException(status_code=400, detail="humidity_target must be within [humidity_min, humidity_max]")
-
-    now = datetime.now(timezone.utc).isoformat()
-    data = payload.model_dump()
-    data["ts"] = now
+    # Ordering is validated by DeviceConfig._check_ranges
+    data = payload.__dict__.copy()
+    data["ts"] = now_iso()
 
-    with _LOCK:
-        _DEVICE_CONFIG[payload.device_id] = data
+    await device_store.set_config(payload.device_id, data)
 
     # Return flattened fields too (easy for Arduino parsing)
     return {
@@ -104,8 +112,7 @@ async def device_config_set(payload: DeviceConfig):
 
 @router.get("/device/config")
 async def device_config_get(device_id: str):
-    with _LOCK:
-        data = _DEVICE_CONFIG.get(device_id)
+    data = await device_store.get_config(device_id)
 
     if not data:
         return {"success": False, "error": "No config set for this device_id yet."}
@@ -0,0 +1,88 @@
+import json
+import os
+from typing import Dict, Any, Optional
+
+from utils.cache_utils import LRUCache
+
+# =========================
+# CONFIG
+# =========================
+# Set ARDURAIN_REDIS_URL (e.g. redis://localhost:6379/0) to share telemetry and
+# device config between uvicorn workers. Without it, state lives in this process,
+# which is only correct with a single worker.
+REDIS_URL = os.getenv("ARDURAIN_REDIS_URL", "")
+TELEMETRY_TTL_S = 24 * 60 * 60
+MAX_DEVICES = 100_000
+
+_TELEMETRY_KEY = "ardurain:tel:{}"
+_CONFIG_KEY = "ardurain:cfg:{}"
+
+# -------------------------
+# In-memory storage
+# -------------------------
+# Bounded so unknown/retired device_ids can't grow memory forever.
+# No lock: callers are async handlers on the single event-loop thread and the
+# in-memory paths never await, so access is not interleaved.
+_TELEMETRY_LATEST = LRUCache(maxsize=MAX_DEVICES, ttl=TELEMETRY_TTL_S)
+_DEVICE_CONFIG = LRUCache(maxsize=MAX_DEVICES)
+
+_redis = None
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis.asyncio as aioredis  # optional dependency: pip install redis
+        _redis = aioredis.from_url(REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+# -------------------------
+# Telemetry
+# -------------------------
+async def set_telemetry(device_id: str, data: Dict[str, Any]) -> None:
+    if not REDIS_URL:
+        _TELEMETRY_LATEST[device_id] = data
+        return
+    await _get_redis().set(_TELEMETRY_KEY.format(device_id), json.dumps(data), ex=TELEMETRY_TTL_S)
+
+
+async def set_telemetry_many(batch: Dict[str, Dict[str, Any]]) -> None:
+    if not REDIS_URL:
+        _TELEMETRY_LATEST.update(batch)
+        return
+    async with _get_redis().pipeline(transaction=False) as pipe:
+        for device_id, data in batch.items():
+            pipe.set(_TELEMETRY_KEY.format(device_id), json.dumps(data), ex=TELEMETRY_TTL_S)
+        await pipe.execute()
+
+
+async def get_telemetry(device_id: str) -> Optional[Dict[str, Any]]:
+    if not REDIS_URL:
+        return _TELEMETRY_LATEST.get(device_id)
+    raw = await _get_redis().get(_TELEMETRY_KEY.format(device_id))
+    return json.loads(raw) if raw else None
+
+
+# -------------------------
+# Device config
+# -------------------------
+async def set_config(device_id: str, data: Dict[str, Any]) -> None:
+    if not REDIS_URL:
+        _DEVICE_CONFIG[device_id] = data
+        return
+    await _get_redis().set(_CONFIG_KEY.format(device_id), json.dumps(data))
+
+
+async def get_config(device_id: str) -> Optional[Dict[str, Any]]:
+    if not REDIS_URL:
+        return _DEVICE_CONFIG.get(device_id)
+    raw = await _get_redis().get(_CONFIG_KEY.format(device_id))
+    return json.loads(raw) if raw else None
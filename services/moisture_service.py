@@ -1,4 +1,5 @@
-from typing import Dict, Tuple, List
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, Iterable, Tuple, List
 
 
 def clamp_int(x: int, lo: int, hi: int) -> int:
@@ -68,30 +69,35 @@ TRAIT_MODIFIERS: Dict[str, Dict[str, int]] = {
     "carnivorous": {"min": +6, "max": +6, "target": +6},
 }
 
+# Flattened at import: trait -> (min, max, target, applied label)
+_MOISTURE_FLAT: Dict[str, Tuple[int, int, int, str]] = {
+    t: (
+        m.get("min", 0),
+        m.get("max", 0),
+        m.get("target", 0),
+        f"{t}({m.get('min',0)},{m.get('max',0)},{m.get('target',0)})",
+    )
+    for t, m in TRAIT_MODIFIERS.items()
+    if m
+}
 
-def compute_moisture(primary: str, traits: List[str]) -> Tuple[int, int, int, List[str]]:
-    base_min, base_max = PRIMARY_MOISTURE_BASE.get(primary, DEFAULT_RANGE)
-    target = midpoint(base_min, base_max)
 
-    applied: List[str] = []
-    mn, mx, tg = base_min, base_max, target
+def compute_moisture(primary: str, traits: Iterable[str]) -> Tuple[int, int, int, Tuple[str, ...]]:
+    """
+    Moisture (min, max, target, applied mods); a view of compute_plant_targets.
+    """
+    t = compute_plant_targets(primary, traits)
+    return t.moisture_min, t.moisture_max, t.moisture_target, t.moisture_mods
 
-    for t in traits:
-        mod = TRAIT_MODIFIERS.get(t)
-        if not mod:
-            continue
-        mn += mod.get("min", 0)
-        mx += mod.get("max", 0)
-        tg += mod.get("target", 0)
-        applied.append(f"{t}({mod.get('min',0)},{mod.get('max',0)},{mod.get('target',0)})")
 
-    mn = clamp_int(mn, 0, 100)
-    mx = clamp_int(mx, 0, 100)
-    if mx < mn:
-        mx = mn
-
-    tg = clamp_int(tg, mn, mx)
-    return mn, mx, tg, applied
+def compute_moisture_batch(
+    primaries: List[str], traits_list: List[List[str]]
+) -> List[Tuple[int, int, int, Tuple[str, ...]]]:
+    """
+    compute_moisture over many plants (e.g. re-scoring a plant DB).
+    Repeated (primary, traits) combinations are served from the memo.
+    """
+    return [compute_moisture(p, t) for p, t in zip(primaries, traits_list)]
 
 
 # =========================
@@ -151,6 +157,13 @@ PRIMARY_HUM_BASE: Dict[str, Tuple[int, int]] = {
     "fern": (60, 90),
 }
 
+# Flattened at import: primary -> (tmin, tmax, hmin, hmax), one lookup per call
+_CLIMATE_DEFAULT: Tuple[int, int, int, int] = PRIMARY_TEMP_BASE_C["houseplant"] + PRIMARY_HUM_BASE["houseplant"]
+_CLIMATE_BASE: Dict[str, Tuple[int, int, int, int]] = {
+    p: PRIMARY_TEMP_BASE_C.get(p, _CLIMATE_DEFAULT[:2]) + PRIMARY_HUM_BASE.get(p, _CLIMATE_DEFAULT[2:])
+    for p in {**PRIMARY_TEMP_BASE_C, **PRIMARY_HUM_BASE}
+}
+
 CLIMATE_TRAIT_MODS: Dict[str, Dict[str, int]] = {
     # Hotter/drier
     "cactus": {"tmin": +2, "tmax": +4, "hmin": -10, "hmax": -10},
@@ -180,26 +193,141 @@ CLIMATE_TRAIT_MODS: Dict[str, Dict[str, int]] = {
     "boreal": {"tmin": -1, "tmax": -1, "hmin": 0, "hmax": 0},
 }
 
+# Flattened at import: trait -> (tmin, tmax, hmin, hmax, applied label)
+_CLIMATE_FLAT: Dict[str, Tuple[int, int, int, int, str]] = {
+    t: (
+        m.get("tmin", 0),
+        m.get("tmax", 0),
+        m.get("hmin", 0),
+        m.get("hmax", 0),
+        f"{t}(t{m.get('tmin',0)},{m.get('tmax',0)} h{m.get('hmin',0)},{m.get('hmax',0)})",
+    )
+    for t, m in CLIMATE_TRAIT_MODS.items()
+    if m
+}
 
-def compute_climate(primary: str, traits: List[str]) -> Tuple[int, int, int, int, int, int, List[str]]:
-    tmin, tmax = PRIMARY_TEMP_BASE_C.get(primary, PRIMARY_TEMP_BASE_C["houseplant"])
-    hmin, hmax = PRIMARY_HUM_BASE.get(primary, PRIMARY_HUM_BASE["houseplant"])
 
-    applied: List[str] = []
+def compute_climate(primary: str, traits: Iterable[str]) -> Tuple[int, int, int, int, int, int, Tuple[str, ...]]:
+    """
+    Climate (temp min/max/target, humidity min/max/target, applied mods);
+    a view of compute_plant_targets.
+    """
+    t = compute_plant_targets(primary, traits)
+    return (
+        t.temp_min,
+        t.temp_max,
+        t.temp_target,
+        t.humidity_min,
+        t.humidity_max,
+        t.humidity_target,
+        t.climate_mods,
+    )
+
+
+def compute_climate_batch(
+    primaries: List[str], traits_list: List[List[str]]
+) -> List[Tuple[int, int, int, int, int, int, Tuple[str, ...]]]:
+    """
+    compute_climate over many plants; repeats are served from the memo.
+    """
+    return [compute_climate(p, t) for p, t in zip(primaries, traits_list)]
 
-    for t in traits:
-        mod = CLIMATE_TRAIT_MODS.get(t)
-        if not mod:
-            continue
-        tmin += mod.get("tmin", 0)
-        tmax += mod.get("tmax", 0)
-        hmin += mod.get("hmin", 0)
-        hmax += mod.get("hmax", 0)
-        applied.append(
-            f"{t}(t{mod.get('tmin',0)},{mod.get('tmax',0)} h{mod.get('hmin',0)},{mod.get('hmax',0)})"
+
+# =========================
+# Combined targets
+# =========================
+@dataclass(frozen=True)
+class PlantTargets:
+    moisture_min: int
+    moisture_max: int
+    moisture_target: int
+    temp_min: int
+    temp_max: int
+    temp_target: int
+    humidity_min: int
+    humidity_max: int
+    humidity_target: int
+    moisture_mods: Tuple[str, ...]
+    climate_mods: Tuple[str, ...]
+
+
+# Traits that move any target; others (e.g. "woody") are dropped from the memo key
+_KNOWN_TRAITS: FrozenSet[str] = frozenset(_MOISTURE_FLAT) | frozenset(_CLIMATE_FLAT)
+
+# Primaries with their own base ranges; any other string gets the defaults,
+# so they all share the "" memo key
+_KNOWN_PRIMARIES: FrozenSet[str] = frozenset(PRIMARY_MOISTURE_BASE) | frozenset(_CLIMATE_BASE)
+
+# (known primary or "", sorted distinct known traits) -> targets. Real
+# inputs repeat a handful of combinations; the cap stops callers sending
+# arbitrary trait subsets from growing it further.
+_TARGETS_MEMO: Dict[Tuple[str, Tuple[str, ...]], PlantTargets] = {}
+_TARGETS_MEMO_MAX = 4096
+
+
+def compute_plant_targets(primary: str, traits: Iterable[str]) -> PlantTargets:
+    """
+    Moisture + climate targets in one pass over traits (same numbers as
+    compute_moisture and compute_climate), memoized per (primary, known traits
+    in sorted order).
+    The applied-mods lists follow the order of traits.
+    """
+    # Repeats are kept: each occurrence applies its modifier, as it always has
+    known = tuple(t for t in traits if t in _KNOWN_TRAITS)
+    ordered = tuple(sorted(known))
+    if len(set(ordered)) < len(ordered):
+        # Repeated traits would make the key space unbounded; rare, so no memo
+        return _compute_plant_targets(primary, known)
+    key = (primary if primary in _KNOWN_PRIMARIES else "", ordered)
+    hit = _TARGETS_MEMO.get(key)
+    if hit is None:
+        hit = _compute_plant_targets(key[0], ordered)
+        if len(_TARGETS_MEMO) < _TARGETS_MEMO_MAX:
+            _TARGETS_MEMO[key] = hit
+    if known != ordered:
+        # The sums don't depend on trait order; only the mods labels do
+        hit = replace(
+            hit,
+            moisture_mods=tuple(_MOISTURE_FLAT[t][3] for t in known if t in _MOISTURE_FLAT),
+            climate_mods=tuple(_CLIMATE_FLAT[t][4] for t in known if t in _CLIMATE_FLAT),
         )
+    return hit
+
+
+def _compute_plant_targets(primary: str, traits: Tuple[str, ...]) -> PlantTargets:
+    mn, mx = PRIMARY_MOISTURE_BASE.get(primary, DEFAULT_RANGE)
+    tg = midpoint(mn, mx)
+    tmin, tmax, hmin, hmax = _CLIMATE_BASE.get(primary, _CLIMATE_DEFAULT)
 
-    # Clamp to sensible bounds
+    moisture_mods: List[str] = []
+    climate_mods: List[str] = []
+
+    for t in traits:
+        dm = _MOISTURE_FLAT.get(t)
+        if dm is not None:
+            d_min, d_max, d_target, label = dm
+            mn += d_min
+            mx += d_max
+            tg += d_target
+            moisture_mods.append(label)
+
+        dc = _CLIMATE_FLAT.get(t)
+        if dc is not None:
+            d_tmin, d_tmax, d_hmin, d_hmax, label = dc
+            tmin += d_tmin
+            tmax += d_tmax
+            hmin += d_hmin
+            hmax += d_hmax
+            climate_mods.append(label)
+
+    # Moisture clamp
+    mn = clamp_int(mn, 0, 100)
+    mx = clamp_int(mx, 0, 100)
+    if mx < mn:
+        mx = mn
+    tg = clamp_int(tg, mn, mx)
+
+    # Climate clamp
     if tmax < tmin:
         tmax = tmin
     tmin = clamp_int(tmin, -30, 60)
@@ -210,7 +338,16 @@ def compute_climate(primary: str, traits: List[str]) -> Tuple[int, int, int, int
     hmin = clamp_int(hmin, 0, 100)
     hmax = clamp_int(hmax, 0, 100)
 
-    ttarget = midpoint(tmin, tmax)
-    htarget = midpoint(hmin, hmax)
-
-    return tmin, tmax, ttarget, hmin, hmax, htarget, applied
+    return PlantTargets(
+        moisture_min=mn,
+        moisture_max=mx,
+        moisture_target=tg,
+        temp_min=tmin,
+        temp_max=tmax,
+        temp_target=midpoint(tmin, tmax),
+        humidity_min=hmin,
+        humidity_max=hmax,
+        humidity_target=midpoint(hmin, hmax),
+        moisture_mods=tuple(moisture_mods),
+        climate_mods=tuple(climate_mods),
+    )
@@ -1,6 +1,8 @@
 import os
-import requests
+import time
 from typing import Dict, Any, List
+from utils.cache_utils import kv_get, kv_prune, kv_put
+from utils.http_utils import SESSION
 from utils.text_utils import dedup_preserve_order
 
 # =========================
@@ -10,49 +12,74 @@ PLANTNET_API_KEY = "2b10MZKP3Jl1Gt8NsY295l4wJO"  # keep your key local
 PROJECT = "all"
 PLANTNET_URL = f"https://my-api.plantnet.org/v2/identify/{PROJECT}?api-key={PLANTNET_API_KEY}"
 
+# Results keyed by image sha256, so re-uploads of the same photo skip the API.
+# One row per upload, so expired rows are pruned as new ones are written.
+PLANTNET_CACHE_DB = "plantnet_cache.sqlite"
+PLANTNET_CACHE_TTL_S = 24 * 60 * 60
+
+# Form fields sent with every identify request (requests only reads it)
+_DATA = {"organs": ["leaf"]}
+
+_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
+
 def _extract_urls_deep(obj: Any) -> List[str]:
+    # Iterative depth-first walk (same visit order as recursion). Only string
+    # values of dicts are candidates; bare strings inside lists are skipped.
     urls: List[str] = []
+    stack: List[Any] = [obj] if isinstance(obj, (dict, list)) else []
 
-    def rec(o: Any):
+    while stack:
+        o = stack.pop()
         if isinstance(o, dict):
-            for _, v in o.items():
-                if isinstance(v, (dict, list)):
-                    rec(v)
-                else:
-                    if isinstance(v, str):
-                        s = v.strip()
-                        if s.startswith("http") and any(
-                            s.lower().endswith(ext) for ext in [".jpg", ".jpeg", ".png", ".webp"]
-                        ):
-                            urls.append(s)
+            stack.extend(reversed(o.values()))
         elif isinstance(o, list):
-            for it in o:
-                rec(it)
+            stack.extend(it for it in reversed(o) if isinstance(it, (dict, list)))
+        elif isinstance(o, str):
+            s = o.strip()
+            if s.startswith("http") and s.lower().endswith(_IMAGE_EXTS):
+                urls.append(s)
 
-    rec(obj)
     return urls
 
 
-def identify_plant(image_path: str) -> Dict[str, Any] | None:
+def identify_plant(image_path: str, image_hash: str = "") -> Dict[str, Any] | None:
     """
     Calls PlantNet and returns:
     - scientific name
     - common names
     - score
     - plantnet_images (best effort)
+
+    If image_hash is given, results are cached in PLANTNET_CACHE_DB under it
+    for PLANTNET_CACHE_TTL_S seconds.
     """
+    if image_hash:
+        hit = kv_get(PLANTNET_CACHE_DB, image_hash)
+        if hit and time.time() - hit.get("fetched_at", 0) < PLANTNET_CACHE_TTL_S:
+            return hit["result"]
+
+    info = _identify_plant_uncached(image_path)
+
+    if image_hash and info:
+        kv_put(PLANTNET_CACHE_DB, image_hash, {"result": info, "fetched_at": int(time.time())})
+        kv_prune(PLANTNET_CACHE_DB, PLANTNET_CACHE_TTL_S)
+    return info
+
+
+def _identify_plant_uncached(image_path: str) -> Dict[str, Any] | None:
     with open(image_path, "rb") as img:
         files = [("images", (os.path.basename(image_path), img, "image/jpeg"))]
-        data = {"organs": ["leaf"]}
 
-        response = requests.post(
+        response = SESSION.post(
             PLANTNET_URL,
             files=files,
-            data=data,
+            data=_DATA,
             timeout=60
         )
-        response.raise_for_status()
-        result = response.json()
+    # the upload is done; release the file before parsing the response
+    response.raise_for_status()
+    result = response.json()
 
     if not result.get("results"):
         return None
@@ -1,8 +1,23 @@
+import re
+import requests
 import wikipedia
-from wikipedia.exceptions import DisambiguationError, PageError
+from functools import lru_cache
+from wikipedia.exceptions import DisambiguationError, PageError, WikipediaException
 from typing import Dict, Any, List
 from utils.text_utils import clean_text
 
+# Image URL filters (case-insensitive; badwords are plain substring matches)
+_IMG_RE = re.compile(r"\.(?:jpg|jpeg|png|webp)\Z", re.IGNORECASE)
+_BADWORDS_RE = re.compile(r"logo|icon|commons-logo|wikimedia|poweredby|edit-icon", re.IGNORECASE)
+
+# Sentence boundary: end punctuation, then whitespace, then something that can
+# start a sentence (so "Digitalis obscura L. is ..." isn't split after "L.")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"“(])")
+
+# What the wikipedia client can raise on a bad page or a failed request
+# (it surfaces odd API payloads as KeyError/IndexError, bad JSON as ValueError)
+_WIKI_ERRORS = (WikipediaException, requests.RequestException, KeyError, IndexError, ValueError)
+
 
 def get_wiki_page(plant_name: str):
     try:
@@ -11,18 +26,22 @@ def get_wiki_page(plant_name: str):
         # try the first suggestion
         try:
             return wikipedia.page(e.options[0], auto_suggest=True, redirect=True)
-        except:
+        except _WIKI_ERRORS:
             return None
     except PageError:
         # fallback to the first word (genus sometimes helps)
         try:
             return wikipedia.page(plant_name.split()[0], auto_suggest=True, redirect=True)
-        except:
+        except _WIKI_ERRORS:
             return None
-    except:
+    except _WIKI_ERRORS:
         return None
 
 
+def _first_sentences(text: str, n: int) -> str:
+    return " ".join(_SENTENCE_END_RE.split(text.strip(), maxsplit=n)[:n])
+
+
 def _clean_categories(cats: List[str], limit: int = 60) -> List[str]:
     out: List[str] = []
 
@@ -72,9 +91,14 @@ def get_wiki_info(plant_name: str) -> Dict[str, Any]:
     - wiki_categories (filtered, up to 60)
     - wiki_title
     - summary_for_tags (TITLE + categories + text) for inference
+
+    Found pages are memoized per process; the returned dict is shared,
+    so treat it as read-only.
     """
-    page = get_wiki_page(plant_name)
-    if page is None:
+    # Only whitespace is normalized: Wikipedia titles are case-sensitive past the first letter
+    try:
+        return _get_wiki_info_cached(" ".join(plant_name.split()))
+    except LookupError:
         return {
             "description_short": "No description available.",
             "description_long": "No description available.",
@@ -85,17 +109,22 @@ def get_wiki_info(plant_name: str) -> Dict[str, Any]:
             "summary_for_tags": "",
         }
 
-    title = getattr(page, "title", "") or ""
 
-    try:
-        desc_short = wikipedia.summary(title, sentences=2)
-    except:
-        desc_short = "No description available."
+@lru_cache(maxsize=2048)
+def _get_wiki_info_cached(plant_name: str) -> Dict[str, Any]:
+    # Raises LookupError when no page is found so misses are not memoized
+    page = get_wiki_page(plant_name)
+    if page is None:
+        raise LookupError(plant_name)
+
+    title = getattr(page, "title", "") or ""
 
+    # One summary request; the short description is sliced from it locally
     try:
         desc_long = wikipedia.summary(title, sentences=10)
-    except:
-        desc_long = desc_short
+        desc_short = _first_sentences(desc_long, 2)
+    except _WIKI_ERRORS:
+        desc_long = desc_short = "No description available."
 
     desc_short = clean_text(desc_short)
     desc_long = clean_text(desc_long)
@@ -104,30 +133,23 @@ def get_wiki_info(plant_name: str) -> Dict[str, Any]:
     wiki_images: List[str] = []
     try:
         for url in page.images:
-            lower = url.lower()
-
-            if not (
-                lower.endswith(".jpg")
-                or lower.endswith(".jpeg")
-                or lower.endswith(".png")
-                or lower.endswith(".webp")
-            ):
+            if not _IMG_RE.search(url):
                 continue
 
-            if any(x in lower for x in ["logo", "icon", "commons-logo", "wikimedia", "poweredby", "edit-icon"]):
+            if _BADWORDS_RE.search(url):
                 continue
 
             wiki_images.append(url)
             if len(wiki_images) >= 3:
                 break
-    except:
+    except _WIKI_ERRORS:
         wiki_images = []
 
     # Categories
     cats: List[str] = []
     try:
         cats = _clean_categories(getattr(page, "categories", []) or [], limit=60)
-    except:
+    except _WIKI_ERRORS:
         cats = []
 
     # ✅ IMPORTANT: feed better hints into inference
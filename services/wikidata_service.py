@@ -1,19 +1,104 @@
-import requests
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any, Tuple, List
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Iterable, Iterator, Tuple, List, Optional
+
+import requests
+
+from utils.cache_utils import kv_get, kv_get_many, kv_len, kv_prune, kv_put, kv_put_many, load_cache
+from utils.http_utils import SESSION
 
-from utils.cache_utils import load_cache, save_cache
-from utils.text_utils import dedup_preserve_order
+try:
+    import ijson  # type: ignore
+except ImportError:
+    # Optional: without it SPARQL responses are buffered and parsed whole
+    ijson = None
+
+try:
+    import ahocorasick  # type: ignore  (pyahocorasick)
+except ImportError:
+    # Optional: without it keywords are found with one substring scan each
+    ahocorasick = None
+
+# Network/HTTP failures and malformed payloads; anything else is a bug
+_FETCH_ERRORS: Tuple[type, ...] = (requests.RequestException, ValueError, KeyError, AttributeError)
+if ijson is not None:
+    _FETCH_ERRORS += (ijson.JSONError,)
 
 WIKIDATA_API = "https://www.wikidata.org/w/api.php"
 WIKIDATA_SPARQL = "https://query.wikidata.org/sparql"
+# OpenRefine reconciliation service for Wikidata (takes batches of queries)
+WIKIDATA_RECON_API = "https://wikidata.reconci.link/en/api"
+RECON_BATCH_SIZE = 50
+# Keyed by normalized scientific name; the JSON file is the old format and is
+# only read once to seed an empty DB.
+WIKIDATA_CACHE_DB = "plant_traits_cache.sqlite"
 WIKIDATA_CACHE_FILE = "plant_traits_cache.json"
+_DB_READY = False
+# QID -> English label of trait values; plants share most of their taxa, so
+# this fills up quickly and rarely needs the API
+WIKIDATA_LABELS_DB = "wikidata_labels.sqlite"
+
+# Final inference results; bump RULES_VERSION whenever the rules change so
+# old results are not served. Rows unwritten for INFER_CACHE_TTL_S are pruned
+# (mostly keys from superseded versions or wiki text).
+INFER_CACHE_DB = "infer_cache.sqlite"
+INFER_CACHE_TTL_S = 30 * 24 * 60 * 60
+RULES_VERSION = 1
+
+# Traits cache entries also store the keywords their labels hit
+# ("matched_kw"); bump KEYWORD_SET_VERSION whenever the keyword vocabulary
+# changes so those sets are recomputed.
+KEYWORD_SET_VERSION = 1
+
+# Traits entries are re-checked against Wikidata after this long (a
+# conditional request when the last response had an ETag/Last-Modified)
+WIKIDATA_CACHE_TTL_S = 30 * 24 * 60 * 60
+
+# Trait values for a set of entities; literal braces are doubled for
+# str.format. Returns bare value QIDs: the label service is the slowest part
+# of the query, and labels are resolved locally (_qid_labels) instead.
+# Each property is its own indexed branch; stacked OPTIONALs on one ?val only
+# ever joined the first property present.
+_SPARQL_TMPL = """
+SELECT DISTINCT ?plant ?val WHERE {{
+  VALUES ?plant {{ {values} }}
+
+  {{ ?plant wdt:P3833 ?val . }}         # growth habit
+  UNION {{ ?plant wdt:P31   ?val . }}   # instance of
+  UNION {{ ?plant wdt:P279  ?val . }}   # subclass of
+  UNION {{ ?plant wdt:P171  ?val . }}   # parent taxon
+}}
+LIMIT {limit}
+"""
+SPARQL_ROWS_PER_QID = 140
+SPARQL_BATCH_SIZE = 50  # QIDs per query; keeps the query service happy
+# The search description stands in for the SPARQL labels only when its
+# keywords agree: at least DESCRIPTION_MIN_RULES score rules for one primary,
+# leading every other primary by DESCRIPTION_MIN_LEAD points
+DESCRIPTION_MIN_RULES = 2
+DESCRIPTION_MIN_LEAD = 8
+
+# Parallel lookups (get_wikidata_traits_many). The query service rate-limits
+# much harder than the action API, so SPARQL requests get their own cap.
+WIKIDATA_WORKERS = 8
+_SPARQL_SLOTS = threading.BoundedSemaphore(4)
 
 
 # =========================
 # Wikidata fetch + caching
 # =========================
 def wikidata_search_entity(scientific_name: str) -> str:
+    return wikidata_search_entity_described(scientific_name)[0]
+
+
+@lru_cache(maxsize=1024)
+def wikidata_search_entity_described(scientific_name: str) -> Tuple[str, str]:
+    """(qid, description) of the best match, or ("", "")."""
     params = {
         "action": "wbsearchentities",
         "search": scientific_name,
@@ -21,297 +106,755 @@ def wikidata_search_entity(scientific_name: str) -> str:
         "format": "json",
         "limit": 1,
     }
-    headers = {"User-Agent": "ArduRain/1.0 (plant project)"}
-    r = requests.get(WIKIDATA_API, params=params, headers=headers, timeout=20)
+    r = SESSION.get(WIKIDATA_API, params=params, timeout=20)
     r.raise_for_status()
     data = r.json()
     results = data.get("search", [])
     if not results:
-        return ""
-    return results[0].get("id", "") or ""
+        return "", ""
+    return results[0].get("id", "") or "", results[0].get("description", "") or ""
+
+
+def wikidata_search_entities_batch(names: List[str]) -> Dict[str, str]:
+    """
+    Resolve many names to QIDs through the Wikidata reconciliation service,
+    RECON_BATCH_SIZE names per request instead of one search per name.
+    Names without a match map to "".
+    """
+    out: Dict[str, str] = {}
+    for i in range(0, len(names), RECON_BATCH_SIZE):
+        chunk = names[i:i + RECON_BATCH_SIZE]
+        queries = {f"q{j}": {"query": name, "limit": 1} for j, name in enumerate(chunk)}
+        r = SESSION.post(WIKIDATA_RECON_API, data={"queries": json.dumps(queries)}, timeout=30)
+        r.raise_for_status()
+        js = r.json()
+        for j, name in enumerate(chunk):
+            results = js.get(f"q{j}", {}).get("result", [])
+            out[name] = (results[0].get("id", "") if results else "") or ""
+    return out
+
+
+def _iter_bindings(r) -> Iterator[Dict[str, Any]]:
+    # Stream results.bindings straight off the socket when ijson is around,
+    # so only one binding is held in memory at a time. Whole bindings rather
+    # than just "val.value": batched queries need ?plant from the same row.
+    if ijson is None:
+        yield from r.json().get("results", {}).get("bindings", [])
+        return
+    r.raw.decode_content = True  # let urllib3 undo gzip before parsing
+    yield from ijson.items(r.raw, "results.bindings.item")
 
 
 def wikidata_get_trait_labels(qid: str) -> List[str]:
     if not qid:
         return []
+    return wikidata_get_trait_labels_batch([qid]).get(qid, [])
 
-    query = f"""
-    SELECT ?valLabel WHERE {{
-      VALUES ?plant {{ wd:{qid} }}
 
-      OPTIONAL {{ ?plant wdt:P3833 ?val . }}   # growth habit
-      OPTIONAL {{ ?plant wdt:P31   ?val . }}   # instance of
-      OPTIONAL {{ ?plant wdt:P279  ?val . }}   # subclass of
-      OPTIONAL {{ ?plant wdt:P171  ?val . }}   # parent taxon
+def wikidata_get_trait_labels_batch(qids: List[str]) -> Dict[str, List[str]]:
+    """
+    Trait labels for many QIDs, SPARQL_BATCH_SIZE per query. Each QID keeps
+    at most SPARQL_ROWS_PER_QID rows, like the old per-QID LIMIT.
+    """
+    qids = [q for q in dict.fromkeys(qids) if q]
+    out: Dict[str, List[str]] = {}
+    for i in range(0, len(qids), SPARQL_BATCH_SIZE):
+        labels, _ = _query_trait_labels(qids[i:i + SPARQL_BATCH_SIZE])
+        out.update(labels or {})
+    return out
+
 
-      SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-    }}
-    LIMIT 140
+def _query_trait_labels(
+    qids: List[str], validators: Optional[Dict[str, str]] = None
+) -> Tuple[Optional[Dict[str, List[str]]], Dict[str, str]]:
     """
+    One SPARQL request for up to SPARQL_BATCH_SIZE QIDs (plus a follow-up
+    when one QID used up the batch's LIMIT). Returns the labels per QID and
+    the response's validators ({"etag", "last_modified"}).
 
-    headers = {
-        "Accept": "application/sparql-results+json",
-        "User-Agent": "ArduRain/1.0 (plant project)",
+    With validators from an earlier response the request is conditional;
+    (None, validators) means 304 Not Modified.
+    """
+    headers = {"Accept": "application/sparql-results+json"}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    vals, new_validators = _query_trait_vals(qids, headers)
+    if vals is None:
+        return None, validators or {}
+
+    names = _qid_labels([v for plant_vals in vals.values() for v in plant_vals])
+    labels = {
+        q: list(dict.fromkeys(names.get(v, v).lower() for v in plant_vals))
+        for q, plant_vals in vals.items()
     }
-    r = requests.get(
+    return labels, new_validators
+
+
+def _query_trait_vals(
+    qids: List[str], headers: Dict[str, str]
+) -> Tuple[Optional[Dict[str, Dict[str, None]]], Dict[str, str]]:
+    # Value QIDs per plant QID (dicts as ordered sets: dedup in the same pass
+    # that collects), at most SPARQL_ROWS_PER_QID rows each, plus the
+    # response validators. None on 304 Not Modified.
+    limit = SPARQL_ROWS_PER_QID * len(qids)
+    query = _SPARQL_TMPL.format(values=" ".join(f"wd:{q}" for q in qids), limit=limit)
+
+    vals: Dict[str, Dict[str, None]] = {q: {} for q in qids}
+    rows: Dict[str, int] = dict.fromkeys(qids, 0)
+    total = 0
+    with _SPARQL_SLOTS, SESSION.get(
         WIKIDATA_SPARQL,
         params={"query": query},
         headers=headers,
         timeout=25,
-    )
-    r.raise_for_status()
-    js = r.json()
+        stream=ijson is not None,
+    ) as r:
+        if r.status_code == 304:
+            return None, {}
+        r.raise_for_status()
+        for b in _iter_bindings(r):
+            total += 1
+            # ?plant comes back as http://www.wikidata.org/entity/Q123
+            qid = b.get("plant", {}).get("value", "").rsplit("/", 1)[-1]
+            if qid not in rows or rows[qid] >= SPARQL_ROWS_PER_QID:
+                continue
+            rows[qid] += 1
+            val = b.get("val", {}).get("value", "").rsplit("/", 1)[-1]
+            # Items only: "somevalue" comes back as a blank-node genid
+            if val[:1] == "Q" and val[1:].isdigit():
+                vals[qid][val] = None
+        validators: Dict[str, str] = {}
+        if r.headers.get("ETag"):
+            validators["etag"] = r.headers["ETag"]
+        if r.headers.get("Last-Modified"):
+            validators["last_modified"] = r.headers["Last-Modified"]
+
+    if total >= limit:
+        # The LIMIT is shared by the batch, so a QID with many statements can
+        # use it up and starve the rest. Re-query the ones under their cap;
+        # a truncated batch always has a capped QID, so each round shrinks.
+        short = [q for q in qids if rows[q] < SPARQL_ROWS_PER_QID]
+        if short and len(short) < len(qids):
+            more, _ = _query_trait_vals(short, {"Accept": headers["Accept"]})
+            vals.update(more or {})
+    return vals, validators
+
+
+def _qid_labels(qids: List[str]) -> Dict[str, str]:
+    """
+    English labels for QIDs, from WIKIDATA_LABELS_DB; unknown ones are
+    fetched with wbgetentities (50 per call) and stored. Like the SPARQL
+    label service, an entity without an English label (or a deleted one) is
+    named by its QID. Only entities in the response are stored, so a QID the
+    API skipped is looked up again next time. Raises ValueError on an API
+    error payload.
+    """
+    qids = list(dict.fromkeys(qids))
+    names: Dict[str, str] = kv_get_many(WIKIDATA_LABELS_DB, qids)
+    missing = [q for q in qids if q not in names]
+    for i in range(0, len(missing), 50):
+        chunk = missing[i:i + 50]
+        params = {
+            "action": "wbgetentities",
+            "ids": "|".join(chunk),
+            "props": "labels",
+            "languages": "en",
+            "format": "json",
+        }
+        r = SESSION.get(WIKIDATA_API, params=params, timeout=20)
+        r.raise_for_status()
+        data = r.json()
+        if "error" in data:
+            raise ValueError(f"wbgetentities: {data['error'].get('info', data['error'])}")
+        entities = data.get("entities", {})
+        fetched = {
+            q: entities[q].get("labels", {}).get("en", {}).get("value") or q
+            for q in chunk
+            if q in entities
+        }
+        kv_put_many(WIKIDATA_LABELS_DB, fetched)
+        names.update(fetched)
+    return names
 
-    out: List[str] = []
-    for b in js.get("results", {}).get("bindings", []):
-        lbl = b.get("valLabel", {}).get("value", "")
-        if lbl:
-            out.append(lbl.lower())
 
-    return list(dict.fromkeys(out))
+def get_wikidata_traits(scientific_name: str) -> Dict[str, Any]:
+    """
+    Memoized per process on the normalized name, so repeat lookups skip the
+    disk cache as well as the network. Treat the returned dict as read-only.
+    """
+    return _get_wikidata_traits_cached(scientific_name.strip().lower())
 
 
-def get_wikidata_traits(scientific_name: str) -> Dict[str, Any]:
-    cache = load_cache(WIKIDATA_CACHE_FILE)
-    key = scientific_name.strip().lower()
+def get_wikidata_traits_many(names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    get_wikidata_traits for many names (e.g. warming a cold cache), with up
+    to WIKIDATA_WORKERS lookups in flight. Keyed by the names as given.
+    """
+    # One lookup per normalized key, so spelling variants don't race each other
+    by_key: Dict[str, List[str]] = {}
+    for name in names:
+        by_key.setdefault(name.strip().lower(), []).append(name)
+
+    out: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=WIKIDATA_WORKERS) as pool:
+        futures = {pool.submit(get_wikidata_traits, key): key for key in by_key}
+        for fut in as_completed(futures):
+            traits = fut.result()
+            for name in by_key[futures[fut]]:
+                out[name] = traits
+    return out
+
+
+def _cache_db() -> str:
+    # First use in this process: import the legacy JSON cache if the DB is
+    # empty. INSERT OR IGNORE, so a racing thread/worker can't clobber rows.
+    global _DB_READY
+    if not _DB_READY:
+        if kv_len(WIKIDATA_CACHE_DB) == 0:
+            legacy = load_cache(WIKIDATA_CACHE_FILE)
+            if legacy:
+                kv_put_many(WIKIDATA_CACHE_DB, legacy, replace=False)
+        _DB_READY = True
+    return WIKIDATA_CACHE_DB
+
+
+@lru_cache(maxsize=1024)
+def _get_wikidata_traits_cached(key: str) -> Dict[str, Any]:
+    hit = kv_get(_cache_db(), key)
+    if hit is not None:
+        if hit.get("source") == "description":
+            if _age_s(hit) > WIKIDATA_CACHE_TTL_S or not _is_telling(" ".join(hit["labels"])):
+                # Expired, or taken under an older threshold: search again (the
+                # description may have changed). On errors the old entry stays.
+                fresh = _fetch_traits(key)
+                if fresh["labels"]:
+                    hit = _with_matched_kw(fresh)
+                    kv_put(_cache_db(), key, hit)
+        elif _age_s(hit) > WIKIDATA_CACHE_TTL_S and hit.get("qid") and "source" not in hit:
+            hit = _with_matched_kw(_refresh_traits(hit))
+            kv_put(_cache_db(), key, hit)
+        if hit.get("kw_version") != KEYWORD_SET_VERSION:
+            # Older entry or vocabulary: the labels are still good, re-scan them
+            hit = _with_matched_kw(hit)
+            kv_put(_cache_db(), key, hit)
+        return hit
+
+    traits = _with_matched_kw(_fetch_traits(key))
+    kv_put(_cache_db(), key, traits)
+    return traits
+
+
+def _age_s(traits: Dict[str, Any]) -> float:
+    fetched_at = traits.get("fetched_at")
+    if isinstance(fetched_at, str):  # entries written before epoch seconds: ISO timestamp
+        try:
+            fetched_at = datetime.fromisoformat(fetched_at).timestamp()
+        except ValueError:
+            fetched_at = 0
+    return time.time() - (fetched_at or 0)
+
+
+def _refresh_traits(traits: Dict[str, Any]) -> Dict[str, Any]:
+    # Re-query the labels of a stale entry. Conditional when the last response
+    # carried an ETag/Last-Modified: a 304 just renews the entry. On errors
+    # the stale entry keeps being served.
+    qid = traits["qid"]
+    validators = {k: traits[k] for k in ("etag", "last_modified") if traits.get(k)}
+    try:
+        by_qid, validators = _query_trait_labels([qid], validators)
+    except _FETCH_ERRORS:
+        return traits
+
+    traits = dict(traits, fetched_at=int(time.time()), **validators)
+    if by_qid is not None:
+        traits["labels"] = by_qid.get(qid, [])
+    return traits
+
+
+def _with_matched_kw(traits: Dict[str, Any]) -> Dict[str, Any]:
+    # Scanned exactly as _infer scans the labels part of its input
+    labels_text = " ".join(traits.get("labels", [])).lower()
+    traits["matched_kw"] = sorted(_scan_keywords(labels_text))
+    traits["kw_version"] = KEYWORD_SET_VERSION
+    return traits
 
-    if key in cache:
-        return cache[key]
 
-    traits = {"qid": "", "labels": [], "fetched_at": datetime.now().isoformat()}
+def _fetch_traits(
+    key: str, qid: Optional[str] = None, labels: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    # Cache entry for a normalized name; qid/labels skip the entity search /
+    # label query when the caller already has them. Fetch errors leave the
+    # entry empty.
+    traits = {"qid": qid or "", "labels": labels or [], "fetched_at": int(time.time())}
 
     try:
-        qid = wikidata_search_entity(scientific_name)
-        traits["qid"] = qid
-        if qid:
-            traits["labels"] = wikidata_get_trait_labels(qid)
-    except:
+        if qid is None:
+            # wbsearchentities is case-insensitive, so the normalized key is fine here
+            qid, desc = wikidata_search_entity_described(key)
+            traits["qid"] = qid
+            # A telling description ("cactus of the deserts of mexico") is
+            # enough to infer from; skip the slow SPARQL query. The entry
+            # records it, so cached lookups stay on this path.
+            desc = desc.lower()
+            if qid and _is_telling(desc):
+                traits["labels"] = [desc]
+                traits["source"] = "description"
+                return traits
+        if qid and labels is None:
+            # Single QID: keep the response validators for conditional refreshes
+            by_qid, validators = _query_trait_labels([qid])
+            traits["labels"] = (by_qid or {}).get(qid, [])
+            traits.update(validators)
+    except _FETCH_ERRORS:
         pass
 
-    cache[key] = traits
-    save_cache(WIKIDATA_CACHE_FILE, cache)
     return traits
 
 
 # =========================
-# Helpers
+# Keywords
 # =========================
-def _has_any(text: str, *words: str) -> bool:
-    return any(w in text for w in words)
+# Matched as substrings of the lowercased labels + wiki text.
+# Trait keywords
+_CACTUS_KW = frozenset({"cactus", "cactaceae"})
+_SUCCULENT_KW = frozenset({"succulent", "crassulaceae", "aloe", "echeveria", "sedum"})
+_XEROPHYTE_KW = frozenset({"xerophyte", "xerophytic"})
+_DROUGHT_KW = frozenset({"drought tolerant", "drought-tolerant", "arid", "semi-arid", "semiarid"})
+_HYDROPHYTE_KW = frozenset({"hydrophyte", "water plant", "aquatic plant"})
+_WETLAND_KW = frozenset({"wetland", "marsh", "swamp", "fen", "riparian"})
+_BOG_KW = frozenset({"bog", "peat", "mire"})
+_ARCTIC_TRAIT_KW = frozenset({"arctic", "tundra", "polar"})
+_ALPINE_TRAIT_KW = frozenset({"alpine", "subalpine", "montane", "high elevation", "high-elevation"})
+_BOREAL_KW = frozenset({"boreal", "taiga"})
+_COLD_HARDY_KW = frozenset({"cold hardy", "cold-hardy", "frost", "freeze", "freezing", "snow", "subzero"})
+
+# Only treat these as "houseplant" evidence when explicit
+_INDOOR_KW = frozenset({
+    "houseplant",
+    "indoor plant",
+    "potted plant",
+    "grown indoors",
+    "cultivated as a houseplant",
+    "commonly kept as a houseplant",
+})
+# A strong signal it is not an indoor “houseplant default”
+_WILD_KW = frozenset({
+    "native to",
+    "native of",
+    "endemic to",
+    "found in",
+    "occurs in",
+    "distributed in",
+    "distribution",
+    "habitat",
+    "wildflower",
+    "grows in",
+    "naturalised",
+    "naturalized",
+    "flora of",
+    "plants of",
+    "vegetation of",
+})
+
+# Primary-score keywords
+_ARCTIC_KW = frozenset({"arctic", "tundra", "polar", "polar desert"})
+_ALPINE_KW = frozenset({"alpine", "subalpine", "montane", "mountain", "high elevation", "high-elevation"})
+_COLD_KW = frozenset({"frost", "freeze", "freezing", "snow", "ice", "subzero"})
+_MEDITERRANEAN_KW = frozenset({"mediterranean", "mediterranea", "maquis", "garrigue"})
+_IBERIAN_KW = frozenset({"spain", "iberian", "andalusia", "portugal", "balearic"})
+_DESERT_KW = frozenset({"desert"})
+_ARID_KW = frozenset({"arid", "semi-arid", "semiarid", "xeric"})
+_AQUATIC_KW = frozenset({"aquatic", "water plant", "hydrophyte"})
+_RAINFOREST_KW = frozenset({"rainforest"})
+_TROPICAL_KW = frozenset({"tropical", "tropics"})
+_SUBTROPICAL_KW = frozenset({"subtropical"})
+_HUMID_KW = frozenset({"humid", "high humidity"})
+_COASTAL_KW = frozenset({"coastal", "shore", "dune", "seashore", "salt spray", "saline", "littoral"})
+_GRASSLAND_KW = frozenset({"grassland", "prairie", "steppe", "meadow"})
+_SAVANNA_KW = frozenset({"savanna", "savannah"})
+_TEMPERATE_KW = frozenset({"temperate"})
+_CANADA_KW = frozenset({"canada", "alberta", "saskatchewan", "british columbia", "rocky mountains"})
+
+_ALL_KEYWORDS: Tuple[str, ...] = tuple(sorted(frozenset().union(
+    _CACTUS_KW, _SUCCULENT_KW, _XEROPHYTE_KW, _DROUGHT_KW, _HYDROPHYTE_KW, _WETLAND_KW,
+    _BOG_KW, _ARCTIC_TRAIT_KW, _ALPINE_TRAIT_KW, _BOREAL_KW, _COLD_HARDY_KW, _INDOOR_KW,
+    _WILD_KW, _ARCTIC_KW, _ALPINE_KW, _COLD_KW, _MEDITERRANEAN_KW, _IBERIAN_KW, _DESERT_KW,
+    _ARID_KW, _AQUATIC_KW, _RAINFOREST_KW, _TROPICAL_KW, _SUBTROPICAL_KW, _HUMID_KW,
+    _COASTAL_KW, _GRASSLAND_KW, _SAVANNA_KW, _TEMPERATE_KW, _CANADA_KW,
+)))
 
+# =========================
+# Rules
+# =========================
+# IMPORTANT: must match keys in moisture_service PRIMARY_MOISTURE_BASE
+_PRIMARY_KEYS: Tuple[str, ...] = (
+    "arctic",
+    "alpine",
+    "temperate_cold",
+    "temperate",
+    "mediterranean",
+    "desert",
+    "grassland",
+    "savanna",
+    "subtropical",
+    "tropical",
+    "rainforest",
+    "wetland",
+    "bog",
+    "aquatic",
+    "coastal",
+    "houseplant",
+)
+_SCORES_TEMPLATE: Dict[str, int] = dict.fromkeys(_PRIMARY_KEYS, 0)
+
+
+# (keywords, trait) — stackable
+_TRAIT_RULES: Tuple[Tuple[FrozenSet[str], str], ...] = (
+    # Dry traits
+    (_CACTUS_KW, "cactus"),
+    (_SUCCULENT_KW, "succulent"),
+    (_XEROPHYTE_KW, "xerophyte"),
+    (_DROUGHT_KW, "drought_tolerant"),
+    # Wet traits
+    (_HYDROPHYTE_KW, "hydrophyte"),
+    (_WETLAND_KW, "wetland_plant"),
+    (_BOG_KW, "bog_plant"),
+    # Cold / altitude traits
+    (_ARCTIC_TRAIT_KW, "arctic"),
+    (_ALPINE_TRAIT_KW, "alpine"),
+    (_BOREAL_KW, "boreal"),
+    (_COLD_HARDY_KW, "cold_hardy"),
+)
+
+# (keywords, primary, delta, why) — applied in order, after the houseplant rules.
+# Trait-based nudges use the trait's own keywords, since traits come only from them.
+_SCORE_RULES: Tuple[Tuple[FrozenSet[str], str, int, str], ...] = (
+    # ---- COLD ----
+    (_ARCTIC_KW, "arctic", 12, "arctic/tundra keywords"),
+    (_ALPINE_KW, "alpine", 10, "alpine/mountain keywords"),
+    (_BOREAL_KW, "temperate_cold", 8, "boreal/taiga keywords"),
+    (_COLD_KW, "temperate_cold", 5, "cold conditions keywords"),
+    # ---- MEDITERRANEAN / EUROPE DRY SHRUBLAND ----
+    # Digitalis obscura is a good example: often Spain + Mediterranean shrublands.
+    (_MEDITERRANEAN_KW, "mediterranean", 10, "mediterranean biome keywords"),
+    (_IBERIAN_KW, "mediterranean", 6, "iberian region keywords"),
+    # ---- DESERT / ARID ----
+    (_DESERT_KW, "desert", 10, "desert keyword"),
+    (_ARID_KW, "desert", 5, "arid/xeric keywords"),
+    (_CACTUS_KW | _SUCCULENT_KW | _XEROPHYTE_KW | _DROUGHT_KW, "desert", 4, "dry traits"),
+    # ---- WET ----
+    (_AQUATIC_KW, "aquatic", 10, "aquatic keywords"),
+    (_BOG_KW, "bog", 9, "bog keywords"),
+    (_WETLAND_KW, "wetland", 8, "wetland keywords"),
+    (_HYDROPHYTE_KW, "aquatic", 2, "hydrophyte trait"),
+    (_BOG_KW, "bog", 2, "bog trait"),
+    (_WETLAND_KW, "wetland", 2, "wetland trait"),
+    # ---- TROPICS / HUMID ----
+    (_RAINFOREST_KW, "rainforest", 9, "rainforest keyword"),
+    (_TROPICAL_KW, "tropical", 6, "tropical keyword"),
+    (_SUBTROPICAL_KW, "subtropical", 5, "subtropical keyword"),
+    (_HUMID_KW, "rainforest", 2, "humid hint"),
+    # ---- COASTAL ----
+    (_COASTAL_KW, "coastal", 7, "coastal keywords"),
+    # ---- OPEN HABITATS ----
+    (_GRASSLAND_KW, "grassland", 7, "grassland keywords"),
+    (_SAVANNA_KW, "savanna", 7, "savanna keywords"),
+    # ---- TEMPERATE GENERAL ----
+    (_TEMPERATE_KW, "temperate", 4, "temperate keyword"),
+    # ---- REGION -> likely climate nudges (lightweight, but helps coverage) ----
+    # If it's explicitly "North America / Canada / Rockies" etc, tend colder/continental.
+    (_CANADA_KW, "temperate_cold", 4, "canada/rockies region"),
+)
 
-def _add_trait(traits: List[str], reasoning: List[str], name: str, why: str) -> None:
-    if name not in traits:
-        traits.append(name)
-        reasoning.append(f"trait: {name} ({why})")
 
+def _index_rules(rules: Tuple[Tuple[Any, ...], ...]) -> Dict[str, Tuple[int, ...]]:
+    # keyword -> positions of the rules it can fire
+    index: Dict[str, List[int]] = {}
+    for i, rule in enumerate(rules):
+        for kw in rule[0]:
+            index.setdefault(kw, []).append(i)
+    return {kw: tuple(ids) for kw, ids in index.items()}
 
-def _add_score(scores: Dict[str, int], reasoning: List[str], key: str, delta: int, why: str) -> None:
-    scores[key] = scores.get(key, 0) + delta
-    reasoning.append(f"primary +{delta} {key} ({why})")
 
+def _fired(index: Dict[str, Tuple[int, ...]], hits: FrozenSet[str]) -> List[int]:
+    # Positions of the rules with at least one hit, in table order
+    fired = set()
+    for kw in hits:
+        fired.update(index.get(kw, ()))
+    return sorted(fired)
 
-def _is_explicit_indoor(text: str) -> bool:
-    # Only treat these as "houseplant" evidence when explicit
-    return _has_any(
-        text,
-        "houseplant",
-        "indoor plant",
-        "potted plant",
-        "grown indoors",
-        "cultivated as a houseplant",
-        "commonly kept as a houseplant",
-    )
 
+# Only rules touched by a hit are visited; sorting the positions keeps the
+# table order, so reasoning reads the same as a full walk.
+_TRAIT_INDEX = _index_rules(_TRAIT_RULES)
+_SCORE_INDEX = _index_rules(_SCORE_RULES)
 
-def _is_wild_context(text: str) -> bool:
-    # A strong signal it is not an indoor “houseplant default”
-    return _has_any(
-        text,
-        "native to",
-        "native of",
-        "endemic to",
-        "found in",
-        "occurs in",
-        "distributed in",
-        "distribution",
-        "habitat",
-        "wildflower",
-        "grows in",
-        "naturalised",
-        "naturalized",
-        "flora of",
-        "plants of",
-        "vegetation of",
-    )
+
+# =========================
+# Helpers
+# =========================
+def _build_automaton():
+    automaton = ahocorasick.Automaton()
+    for kw in _ALL_KEYWORDS:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+# Aho-Corasick reports every (overlapping) occurrence, so the hit set is the
+# same as the substring scan below, just found in one pass over the text.
+# (Hyperscan would do the same job, but it is x86/Linux-only and ~150
+# literals on a few KB of text don't need a SIMD regex engine.)
+_AUTOMATON = _build_automaton() if ahocorasick is not None else None
+
+# Chars either side of a join that a straddling keyword can reach
+_SEAM = max(map(len, _ALL_KEYWORDS)) - 1
+
+
+def _scan_keywords(text: str) -> FrozenSet[str]:
+    # Every rule then tests this set. Without the automaton: one C-level
+    # substring scan per distinct keyword. Deliberately substring-based
+    # rather than a token set: "arid" must still hit "semi-arid", "desert"
+    # must hit "deserts", etc. Tokenizing first was also measured slower on
+    # real wiki text (the regex split costs more than the C-level substring
+    # scans it saves).
+    if _AUTOMATON is not None:
+        return frozenset(kw for _, kw in _AUTOMATON.iter(text))
+    return frozenset(k for k in _ALL_KEYWORDS if k in text)
+
+
+def _scan_joined(left: str, left_hits: FrozenSet[str], right: str) -> FrozenSet[str]:
+    # Same hits as _scan_keywords(left + " " + right), given left's hits: scan
+    # right, plus the seam for keywords that straddle the join.
+    if not right:
+        # No keyword has edge whitespace, so a bare join adds nothing
+        return left_hits
+    seam = left[-_SEAM:] + " " + right[:_SEAM]
+    return left_hits | _scan_keywords(right) | _scan_keywords(seam)
+
+
+def _is_telling(desc: str) -> bool:
+    # Agreement, not volume: several categories firing ("arid" + "wetland" +
+    # "tropical") means the description is ambiguous. Counted over score
+    # rules, so nested keywords ("polar desert", "polar") can't inflate it and
+    # the houseplant wording takes no part.
+    totals: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    for i in _fired(_SCORE_INDEX, _scan_keywords(desc)):
+        _, key, delta, _why = _SCORE_RULES[i]
+        totals[key] = totals.get(key, 0) + delta
+        counts[key] = counts.get(key, 0) + 1
+    if not totals:
+        return False
+    best = max(totals, key=totals.__getitem__)
+    runner_up = max((v for k, v in totals.items() if k != best), default=0)
+    return counts[best] >= DESCRIPTION_MIN_RULES and totals[best] - runner_up >= DESCRIPTION_MIN_LEAD
+
+
+def _has_any(hits: FrozenSet[str], keywords: FrozenSet[str]) -> bool:
+    return not keywords.isdisjoint(hits)
+
+
+def _add_trait(traits: Dict[str, None], reasoning: Optional[List[str]], name: str, why: str) -> None:
+    if name not in traits:
+        traits[name] = None
+        if reasoning is not None:
+            reasoning.append(f"trait: {name} ({why})")
+
+
+def _add_score(scores: Dict[str, int], reasoning: Optional[List[str]], key: str, delta: int, why: str) -> None:
+    scores[key] += delta
+    if reasoning is not None:
+        reasoning.append(f"primary +{delta} {key} ({why})")
+
+
+def _add_scores_pruned(scores: Dict[str, int], fired: List[int]) -> None:
+    # Rule deltas are all positive: once the leader is ahead of the runner-up by
+    # more than the remaining fired rules can add, the outcome is settled.
+    left = sum(_SCORE_RULES[i][2] for i in fired)
+    # Only houseplant has moved off zero before the rule table runs
+    hp = scores["houseplant"]
+    lead, lead_v, second_v = ("houseplant", hp, 0) if hp > 0 else ("", 0, 0)
+    for i in fired:
+        _, key, delta, _why = _SCORE_RULES[i]
+        v = scores[key] + delta
+        scores[key] = v
+        left -= delta
+        if key == lead:
+            lead_v = v
+        elif v > lead_v:
+            lead, lead_v, second_v = key, v, lead_v
+        elif v > second_v:
+            second_v = v
+        if lead_v - second_v > left:
+            return
 
 
 # =========================
 # Main inference
 # =========================
-def infer_primary_and_traits(scientific_name: str, wiki_hint: str) -> Tuple[str, List[str], List[str]]:
+@lru_cache(maxsize=2048)
+def infer_primary_and_traits(
+    scientific_name: str,
+    wiki_hint: str,
+    debug: bool = False,
+    wd_labels: Optional[Tuple[str, ...]] = None,
+    wd_hits: Optional[Tuple[str, ...]] = None,
+) -> Tuple[str, List[str], List[str]]:
     """
     Returns:
       primary_category: str
       traits: List[str]
-      reasoning: List[str]
+      reasoning: List[str] (empty unless debug=True)
 
     NOTE: wiki_hint already includes categories (from your wiki_service),
     so this function benefits a lot from terms like:
     "Flora of Spain", "Mediterranean flora", "Alpine plants", etc.
+
+    Pass wd_labels (the "labels" of get_wikidata_traits, as a tuple) when
+    they were already fetched; the function then makes no network calls.
+    wd_hits (the entry's "matched_kw") additionally skips re-scanning them.
+
+    Results are memoized per (scientific_name, wiki_hint) in process and on
+    disk per (labels, wiki_hint) in INFER_CACHE_DB; treat the returned lists
+    as read-only.
     """
+    if wd_labels is None:
+        wd = get_wikidata_traits(scientific_name)
+        wd_labels = wd.get("labels", [])
+        wd_hits = wd.get("matched_kw")
+
+    key = _infer_cache_key(wd_labels, wiki_hint, debug)
+    hit = kv_get(INFER_CACHE_DB, key)
+    if hit is not None:
+        return hit["primary"], hit["traits"], hit["reasoning"]
+
+    label_hits = frozenset(wd_hits) if wd_hits is not None else None
+    primary, traits, reasoning = _infer(wd_labels, wiki_hint, debug, label_hits)
+    kv_put(INFER_CACHE_DB, key, {
+        "primary": primary,
+        "traits": traits,
+        "reasoning": reasoning,
+        "fetched_at": int(time.time()),
+    })
+    kv_prune(INFER_CACHE_DB, INFER_CACHE_TTL_S)
+    return primary, traits, reasoning
 
-    reasoning: List[str] = []
-    traits: List[str] = []
 
-    wd = get_wikidata_traits(scientific_name)
-    labels_text = " ".join(wd.get("labels", [])).lower()
+def _infer_cache_key(labels: Iterable[str], wiki_hint: str, debug: bool) -> str:
+    # The result depends only on these inputs (and the rules), not on the name
+    h = hashlib.blake2b(
+        f"{RULES_VERSION}.{KEYWORD_SET_VERSION}|{int(debug)}|".encode(), digest_size=16
+    )
+    h.update("\x1f".join(labels).encode())
+    h.update(b"\x1e")
+    h.update((wiki_hint or "").encode())
+    return h.hexdigest()
+
+
+def _infer(
+    wd_labels: Iterable[str],
+    wiki_hint: str,
+    debug: bool,
+    label_hits: Optional[FrozenSet[str]] = None,
+) -> Tuple[str, List[str], List[str]]:
+    # Reasoning strings are only formatted when someone is going to read them
+    reasoning: Optional[List[str]] = [] if debug else None
+    # dict as an ordered set: O(1) membership, already deduped at the end
+    traits: Dict[str, None] = {}
+
+    labels_text = " ".join(wd_labels).lower()
     wiki_text = (wiki_hint or "").lower()
-    combined = (labels_text + " " + wiki_text).strip()
+    if label_hits is None:
+        label_hits = _scan_keywords(labels_text)
+    hits = _scan_joined(labels_text, label_hits, wiki_text)
 
     # -------------------------
     # TRAITS (stackable)
     # -------------------------
-    # Dry traits
-    if _has_any(combined, "cactus", "cactaceae"):
-        _add_trait(traits, reasoning, "cactus", "keyword")
-    if _has_any(combined, "succulent", "crassulaceae", "aloe", "echeveria", "sedum"):
-        _add_trait(traits, reasoning, "succulent", "keyword")
-    if _has_any(combined, "xerophyte", "xerophytic"):
-        _add_trait(traits, reasoning, "xerophyte", "keyword")
-    if _has_any(combined, "drought tolerant", "drought-tolerant", "arid", "semi-arid", "semiarid"):
-        _add_trait(traits, reasoning, "drought_tolerant", "keyword")
-
-    # Wet traits
-    if _has_any(combined, "hydrophyte", "water plant", "aquatic plant"):
-        _add_trait(traits, reasoning, "hydrophyte", "keyword")
-    if _has_any(combined, "wetland", "marsh", "swamp", "fen", "riparian"):
-        _add_trait(traits, reasoning, "wetland_plant", "keyword")
-    if _has_any(combined, "bog", "peat", "mire"):
-        _add_trait(traits, reasoning, "bog_plant", "keyword")
-
-    # Cold / altitude traits
-    if _has_any(combined, "arctic", "tundra", "polar"):
-        _add_trait(traits, reasoning, "arctic", "keyword")
-    if _has_any(combined, "alpine", "subalpine", "montane", "high elevation", "high-elevation"):
-        _add_trait(traits, reasoning, "alpine", "keyword")
-    if _has_any(combined, "boreal", "taiga"):
-        _add_trait(traits, reasoning, "boreal", "keyword")
-    if _has_any(combined, "cold hardy", "cold-hardy", "frost", "freeze", "freezing", "snow", "subzero"):
-        _add_trait(traits, reasoning, "cold_hardy", "keyword")
+    for i in _fired(_TRAIT_INDEX, hits):
+        _add_trait(traits, reasoning, _TRAIT_RULES[i][1], "keyword")
 
     # -------------------------
     # PRIMARY CATEGORY SCORING
     # -------------------------
-    # IMPORTANT: must match keys in moisture_service PRIMARY_MOISTURE_BASE
-    PRIMARY_KEYS = [
-        "arctic",
-        "alpine",
-        "temperate_cold",
-        "temperate",
-        "mediterranean",
-        "desert",
-        "grassland",
-        "savanna",
-        "subtropical",
-        "tropical",
-        "rainforest",
-        "wetland",
-        "bog",
-        "aquatic",
-        "coastal",
-        "houseplant",
-    ]
-    scores: Dict[str, int] = {k: 0 for k in PRIMARY_KEYS}
+    scores: Dict[str, int] = _SCORES_TEMPLATE.copy()
 
     # ---- HARD RULE: houseplant only if explicit ----
-    explicit_houseplant = _is_explicit_indoor(combined)
+    explicit_houseplant = _has_any(hits, _INDOOR_KW)
     if explicit_houseplant:
         _add_score(scores, reasoning, "houseplant", 10, "explicit indoor wording")
     else:
         # Push houseplant down by default so it doesn't win accidentally
         scores["houseplant"] -= 6
-        reasoning.append("primary -6 houseplant (not explicitly indoor)")
+        if reasoning is not None:
+            reasoning.append("primary -6 houseplant (not explicitly indoor)")
 
     # If it's clearly wild/native context, penalize houseplant further
-    if _is_wild_context(combined):
+    if _has_any(hits, _WILD_KW):
         scores["houseplant"] -= 6
-        reasoning.append("primary -6 houseplant (wild/native context)")
-
-    # ---- COLD ----
-    if _has_any(combined, "arctic", "tundra", "polar", "polar desert"):
-        _add_score(scores, reasoning, "arctic", 12, "arctic/tundra keywords")
-    if _has_any(combined, "alpine", "subalpine", "montane", "mountain", "high elevation", "high-elevation"):
-        _add_score(scores, reasoning, "alpine", 10, "alpine/mountain keywords")
-    if _has_any(combined, "boreal", "taiga"):
-        _add_score(scores, reasoning, "temperate_cold", 8, "boreal/taiga keywords")
-    if _has_any(combined, "frost", "freeze", "freezing", "snow", "ice", "subzero"):
-        _add_score(scores, reasoning, "temperate_cold", 5, "cold conditions keywords")
+        if reasoning is not None:
+            reasoning.append("primary -6 houseplant (wild/native context)")
 
-    # ---- MEDITERRANEAN / EUROPE DRY SHRUBLAND ----
-    # Digitalis obscura is a good example: often Spain + Mediterranean shrublands.
-    if _has_any(combined, "mediterranean", "mediterranea", "maquis", "garrigue"):
-        _add_score(scores, reasoning, "mediterranean", 10, "mediterranean biome keywords")
-    if _has_any(combined, "spain", "iberian", "andalusia", "portugal", "balearic"):
-        _add_score(scores, reasoning, "mediterranean", 6, "iberian region keywords")
-
-    # ---- DESERT / ARID ----
-    if _has_any(combined, "desert"):
-        _add_score(scores, reasoning, "desert", 10, "desert keyword")
-    if _has_any(combined, "arid", "semi-arid", "semiarid", "xeric"):
-        _add_score(scores, reasoning, "desert", 5, "arid/xeric keywords")
-    if any(t in traits for t in ["cactus", "succulent", "xerophyte", "drought_tolerant"]):
-        _add_score(scores, reasoning, "desert", 4, "dry traits")
-
-    # ---- WET ----
-    if _has_any(combined, "aquatic", "water plant", "hydrophyte"):
-        _add_score(scores, reasoning, "aquatic", 10, "aquatic keywords")
-    if _has_any(combined, "bog", "peat", "mire"):
-        _add_score(scores, reasoning, "bog", 9, "bog keywords")
-    if _has_any(combined, "wetland", "marsh", "swamp", "fen", "riparian"):
-        _add_score(scores, reasoning, "wetland", 8, "wetland keywords")
-    if "hydrophyte" in traits:
-        _add_score(scores, reasoning, "aquatic", 2, "hydrophyte trait")
-    if "bog_plant" in traits:
-        _add_score(scores, reasoning, "bog", 2, "bog trait")
-    if "wetland_plant" in traits:
-        _add_score(scores, reasoning, "wetland", 2, "wetland trait")
-
-    # ---- TROPICS / HUMID ----
-    if _has_any(combined, "rainforest"):
-        _add_score(scores, reasoning, "rainforest", 9, "rainforest keyword")
-    if _has_any(combined, "tropical", "tropics"):
-        _add_score(scores, reasoning, "tropical", 6, "tropical keyword")
-    if _has_any(combined, "subtropical"):
-        _add_score(scores, reasoning, "subtropical", 5, "subtropical keyword")
-    if _has_any(combined, "humid", "high humidity"):
-        _add_score(scores, reasoning, "rainforest", 2, "humid hint")
-
-    # ---- COASTAL ----
-    if _has_any(combined, "coastal", "shore", "dune", "seashore", "salt spray", "saline", "littoral"):
-        _add_score(scores, reasoning, "coastal", 7, "coastal keywords")
-
-    # ---- OPEN HABITATS ----
-    if _has_any(combined, "grassland", "prairie", "steppe", "meadow"):
-        _add_score(scores, reasoning, "grassland", 7, "grassland keywords")
-    if _has_any(combined, "savanna", "savannah"):
-        _add_score(scores, reasoning, "savanna", 7, "savanna keywords")
-
-    # ---- TEMPERATE GENERAL ----
-    if _has_any(combined, "temperate"):
-        _add_score(scores, reasoning, "temperate", 4, "temperate keyword")
-
-    # ---- REGION -> likely climate nudges (lightweight, but helps coverage) ----
-    # If it's explicitly "North America / Canada / Rockies" etc, tend colder/continental.
-    if _has_any(combined, "canada", "alberta", "saskatchewan", "british columbia", "rocky mountains"):
-        _add_score(scores, reasoning, "temperate_cold", 4, "canada/rockies region")
+    fired = _fired(_SCORE_INDEX, hits)
+    if reasoning is None:
+        _add_scores_pruned(scores, fired)
+    else:
+        # Debug output lists every fired rule, so no pruning here
+        for i in fired:
+            _, key, delta, why = _SCORE_RULES[i]
+            _add_score(scores, reasoning, key, delta, why)
 
     # Choose best
-    primary = max(scores.items(), key=lambda kv: kv[1])[0]
-    if scores.get(primary, 0) <= 0:
+    # Plain loop: measured faster than max(key=itemgetter(1)) or
+    # max(_PRIMARY_KEYS, key=scores.__getitem__) on ~16 keys; ties keep the first key
+    primary, best = "", None
+    for k, v in scores.items():
+        if best is None or v > best:
+            primary, best = k, v
+    if best <= 0:
         # Better fallback than "houseplant": use temperate unless explicitly indoor
         primary = "houseplant" if explicit_houseplant else "temperate"
-        reasoning.append(f"primary fallback: {primary} (no strong signals)")
+        if reasoning is not None:
+            reasoning.append(f"primary fallback: {primary} (no strong signals)")
 
-    traits = dedup_preserve_order(traits)
-    return primary, traits, reasoning
+    return primary, list(traits), reasoning if reasoning is not None else []
+
+
+def batch_infer(
+    names: List[str], wiki_hints: Optional[Dict[str, str]] = None
+) -> Dict[str, Tuple[str, List[str], List[str]]]:
+    """
+    infer_primary_and_traits for many names (e.g. seeding from a catalogue).
+    Names missing from the Wikidata cache are resolved together with
+    wikidata_search_entities_batch and wikidata_get_trait_labels_batch
+    instead of one entity search and one label query each.
+
+    wiki_hints maps name -> wiki_hint; names without one use "".
+    """
+    wiki_hints = wiki_hints or {}
+    db = _cache_db()
+
+    misses = [k for k in dict.fromkeys(n.strip().lower() for n in names) if kv_get(db, k) is None]
+    if misses:
+        try:
+            # Unmatched names ("") are left to get_wikidata_traits below, which
+            # tries its own per-name search rather than caching an empty entry
+            qids = {k: q for k, q in wikidata_search_entities_batch(misses).items() if q}
+        except _FETCH_ERRORS:
+            # Reconciliation unavailable: get_wikidata_traits searches per name below
+            qids = {}
+        labels: Optional[Dict[str, List[str]]]
+        try:
+            labels = wikidata_get_trait_labels_batch(list(qids.values()))
+        except _FETCH_ERRORS:
+            labels = None  # fall back to one label query per QID
+        for key, qid in qids.items():
+            qid_labels = labels.get(qid, []) if labels is not None else None
+            kv_put(db, key, _with_matched_kw(_fetch_traits(key, qid, qid_labels)))
+
+    return {name: infer_primary_and_traits(name, wiki_hints.get(name, "")) for name in names}
@@ -0,0 +1,43 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+USER_AGENT = "ArduRain/1.0 (plant project)"
+
+# Upstream calls run in asyncio's default thread pool (up to 32 threads),
+# so keep enough pooled connections per host that concurrent lookups don't
+# have to discard and re-open them.
+HTTP_POOL_SIZE = int(os.getenv("ARDURAIN_HTTP_POOL_SIZE", "32"))
+
+# Back off and retry rate limits / transient upstream errors (Wikidata's
+# query service answers 429 under load). Only idempotent methods are retried,
+# so PlantNet POSTs are never re-sent. Retry-After is ignored: WDQS can ask
+# for a minute or more, and these retries sleep on a request-path thread, so
+# backoff_factor alone sets the wait (a few seconds at most).
+# raise_on_status=False hands the last response back, so callers'
+# raise_for_status() still reports the real status code.
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+
+# One session per process, so TCP/TLS connections to PlantNet and Wikidata
+# are kept alive and reused instead of re-handshaking on every call.
+SESSION = requests.Session()
+# Compressed responses (SPARQL JSON shrinks several-fold). Spelled out rather
+# than left to requests' defaults; make_headers only lists codings urllib3
+# can decode here (br/zstd when brotli/zstandard are installed).
+SESSION.headers.update({
+    "User-Agent": USER_AGENT,
+    "Accept-Encoding": make_headers(accept_encoding=True)["accept-encoding"],
+})
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_SIZE, max_retries=HTTP_RETRY),
+)
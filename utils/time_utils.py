@@ -0,0 +1,15 @@
+import time
+from datetime import datetime, timezone
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def file_timestamp() -> str:
+    """
+    UTC timestamp for filenames, e.g. 2026-01-23_01-10-41_123456.
+    The microsecond suffix keeps uploads in the same second from colliding.
+    """
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime("%Y-%m-%d_%H-%M-%S", time.gmtime(sec)) + f"_{ns // 1000:06d}"